@@ -5,5 +5,6 @@ setup(
     version="0.1",
     packages=find_packages(),
     install_requires=['click'],
+    extras_require={'fast': ['pyahocorasick', 'xxhash']},
     python_requires='>=3.6',
 )
\ No newline at end of file
@@ -149,12 +149,10 @@ def stats(directory: str) -> None:
         return
 
     try:
-        # Отримання всіх файлів у директорії
-        all_files = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                all_files.append(file_path)
+        # Отримання всіх файлів у директорії (генератор, без повного списку в пам'яті)
+        all_files = (os.path.join(root, file)
+                     for root, _, files in os.walk(directory)
+                     for file in files)
 
         # Отримання статистики
         stats = analyzer.get_directory_statistics(all_files)
@@ -1,10 +1,166 @@
 import os
 import re
+import heapq
+import hashlib
 import mimetypes
 import logging
-import chardet
 from collections import defaultdict
 from datetime import datetime
+from functools import lru_cache
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+from src.utils.file_utils import count_lines_in_stream
+
+#Кількість файлів у списках найбільших і найновіших файлів
+TOP_FILES_LIMIT = 10
+
+#Пошук дублікатів: розмір блоків для часткового і повного хешування
+HASH_BLOCK_SIZE = 64 * 1024
+HASH_CHUNK_SIZE = 1 << 20
+
+#Розмір зразка для визначення кодування (4 КіБ)
+ENCODING_SAMPLE_SIZE = 4096
+
+#Розширення файлів вихідного коду, які вважаються текстовими
+_CODE_EXTENSIONS = frozenset([
+    '.py', '.js', '.html', '.css', '.java', '.c', '.cpp', '.cs',
+    '.php', '.rb', '.go', '.ts', '.jsx', '.tsx', '.md', '.json',
+    '.xml', '.sql', '.sh', '.bat', '.ps1'
+])
+
+#Базове розширення для відображення мов
+_EXT_TO_LANG = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.html': 'HTML',
+    '.css': 'CSS',
+    '.java': 'Java',
+    '.c': 'C',
+    '.cpp': 'C++',
+    '.cs': 'C#',
+    '.php': 'PHP',
+    '.rb': 'Ruby',
+    '.go': 'Go',
+    '.ts': 'TypeScript',
+    '.jsx': 'React',
+    '.tsx': 'React',
+    '.md': 'Markdown',
+    '.json': 'JSON',
+    '.xml': 'XML',
+    '.sql': 'SQL',
+    '.sh': 'Shell',
+    '.bat': 'Batch',
+    '.ps1': 'PowerShell'
+}
+
+
+def _split_extension(file_path):
+    """Повертає розширення файлу в нижньому регістрі"""
+    return os.path.splitext(file_path)[1].lower()
+
+
+@lru_cache(maxsize=4096)
+def _guess_mime_type(extension):
+    """
+    Визначення міметипу за розширенням файлу
+
+    Результат кешується за розширенням, тож складені розширення (.tar.gz)
+    визначаються лише за останньою частиною.
+
+    Args:
+        extension (str): Розширення в нижньому регістрі (з крапкою)
+
+    Returns:
+        str: Міметип або None
+    """
+    #База міметипів ініціалізується лише при першому виклику guess_type
+    mime_type, _ = mimetypes.guess_type("file" + extension)
+    return mime_type
+
+
+def _is_text_type(mime_type, ext):
+    """Перевірка, чи міметип або розширення вказують на текстовий файл"""
+    return bool(mime_type and mime_type.startswith('text/')) or ext in _CODE_EXTENSIONS
+
+
+def _looks_like_text(sample):
+    """
+    Визначення кодування зразка вмісту
+
+    Args:
+        sample (bytes): Початок файлу
+
+    Returns:
+        bool: True, якщо кодування визначено з достатньою впевненістю
+    """
+    #chardet імпортується лише тоді, коли справді потрібне визначення кодування
+    import chardet
+
+    result = chardet.detect(sample)
+    return bool(result['encoding'] and result['confidence'] > 0.7)
+
+
+def _new_hasher():
+    """Створення хешера вмісту: xxh3_64, якщо встановлено xxhash, інакше blake2b"""
+    if xxhash is not None:
+        return xxhash.xxh3_64()
+    return hashlib.blake2b(digest_size=8)
+
+
+def _partial_digest(file_path, size):
+    """
+    Хеш перших і останніх HASH_BLOCK_SIZE байтів файлу
+
+    Args:
+        file_path (str): Шлях до файлу
+        size (int): Розмір файлу
+
+    Returns:
+        str: Шістнадцятковий хеш
+    """
+    hasher = _new_hasher()
+    with open(file_path, 'rb') as f:
+        hasher.update(f.read(HASH_BLOCK_SIZE))
+        if size > HASH_BLOCK_SIZE:
+            f.seek(max(HASH_BLOCK_SIZE, size - HASH_BLOCK_SIZE))
+            hasher.update(f.read(HASH_BLOCK_SIZE))
+    return hasher.hexdigest()
+
+
+def _full_digest(file_path):
+    """
+    Хеш всього вмісту файлу
+
+    Args:
+        file_path (str): Шлях до файлу
+
+    Returns:
+        str: Шістнадцятковий хеш
+    """
+    hasher = _new_hasher()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _push_top(heap, entry, limit=TOP_FILES_LIMIT):
+    """
+    Додавання запису до мін-купи з не більше ніж limit найбільших записів
+
+    Args:
+        heap (list): Купа кортежів (ключ, -порядковий номер, file_info)
+        entry (tuple): Новий запис
+        limit (int): Максимальний розмір купи
+    """
+    if len(heap) < limit:
+        heapq.heappush(heap, entry)
+    elif entry > heap[0]:
+        heapq.heapreplace(heap, entry)
 
 
 class FileAnalyzer:
@@ -13,59 +169,98 @@ class FileAnalyzer:
     def __init__(self):
         """Ініціалізація файлового аналізатора"""
         self.logger = logging.getLogger(__name__)
-        #Ініціалізація міметипів
-        mimetypes.init()
+        self._category_rules = None
 
-    def determine_file_category(self, file_path, category_rules):
+    def compile_rules(self, category_rules):
         """
-        Визначення категорії файлу на основі правил
+        Генерація спеціалізованої функції категоризації для заданих правил
+
+        Правила перетворюються на вихідний код функції з послідовними
+        перевірками для кожної категорії (розширення, шаблони імен, міметипи)
+        у тому ж порядку, що й у словнику правил. Самі значення правил
+        передаються через простір імен функції, а не вставляються в код.
+        Результат зберігається як self._classify(filename, ext, mime_type).
 
         Args:
-            file_path (str): Шлях до файлу
             category_rules (dict): Словник з назвами категорій як ключами та правилами як значеннями
-
-        Returns:
-            str: Назва категорії або None якщо немає збігу категорій
         """
-        if not os.path.isfile(file_path):
-            return None
+        namespace = {}
+        lines = ["def _classify(filename, ext, mime_type):"]
+
+        for index, (category, rules) in enumerate(category_rules.items()):
+            namespace[f"_CAT_{index}"] = category
+
+            if "extensions" in rules:
+                namespace[f"_EXTS_{index}"] = frozenset(rules["extensions"])
+                lines.append(f"    if ext in _EXTS_{index}: return _CAT_{index}")
+
+            if rules.get("patterns"):
+                namespace[f"_PAT_{index}"] = re.compile(
+                    "|".join(f"(?:{self._pattern_source(pattern)})" for pattern in rules["patterns"]),
+                    re.IGNORECASE)
+                lines.append(f"    if _PAT_{index}.search(filename): return _CAT_{index}")
 
-        filename = os.path.basename(file_path)
-        extension = os.path.splitext(filename)[1].lower()
+            if "mime_types" in rules:
+                namespace[f"_MIMES_{index}"] = frozenset(rules["mime_types"])
+                lines.append(f"    if mime_type and mime_type in _MIMES_{index}: return _CAT_{index}")
+
+        lines.append("    return None")
+
+        exec(compile("\n".join(lines), "<category_rules>", "exec"), namespace)
+        self._category_rules = category_rules
+        self._classify = namespace["_classify"]
+
+    @staticmethod
+    def _pattern_source(pattern):
+        """Повертає шаблон як регулярний вираз, або як літерал, якщо він не є коректним виразом"""
+        try:
+            re.compile(pattern)
+            return pattern
+        except re.error:
+            return re.escape(pattern)
 
-        #Спроба визначити міметипів
-        mime_type, _ = mimetypes.guess_type(file_path)
+    def determine_file_category(self, filename, extension, mime_type, category_rules):
+        """
+        Визначення категорії файлу на основі правил
 
-        #Перегляд кожної категорії і перевірка, чи відповідає файл правилам
-        for category, rules in category_rules.items():
-            #Перевірка відповідністі розширення
-            if "extensions" in rules and extension[1:] in rules["extensions"]:
-                return category
+        Файлова система не перевіряється: викликач (наприклад, обхід через
+        os.scandir) вже знає, що це файл, і передає його ім'я, розширення та міметип.
 
-            #Перевірка шаблонів імен файлів
-            if "patterns" in rules:
-                for pattern in rules["patterns"]:
-                    if re.search(pattern, filename, re.IGNORECASE):
-                        return category
+        Args:
+            filename (str): Ім'я файлу
+            extension (str): Розширення в нижньому регістрі (з крапкою)
+            mime_type (str): Міметип (може бути None)
+            category_rules (dict): Словник з назвами категорій як ключами та правилами як значеннями
 
-            #Перевірка міметипів
-            if mime_type and "mime_types" in rules and mime_type in rules["mime_types"]:
-                return category
+        Returns:
+            str: Назва категорії або None якщо немає збігу категорій
+        """
+        if category_rules is not self._category_rules:
+            self.compile_rules(category_rules)
 
-        return None
+        return self._classify(filename, extension[1:], mime_type)
 
-    def get_file_info(self, file_path):
+    def get_file_info(self, file_path, stat_info=None, extension=None, mime_type=None):
         """
         Отримання інформації про файл
 
         Args:
             file_path (str): Шлях до файлу
+            stat_info (os.stat_result): Вже отриманий результат stat (None - виконати os.stat)
+            extension (str): Вже визначене розширення в нижньому регістрі
+                (None - визначити розширення і міметип за шляхом)
+            mime_type (str): Вже визначений міметип (може бути None, якщо не визначено)
 
         Returns:
             dict: Словник з інформацією про файл
         """
         try:
-            stat_info = os.stat(file_path)
+            if stat_info is None:
+                stat_info = os.stat(file_path)
+
+            if extension is None:
+                extension = _split_extension(file_path)
+                mime_type = _guess_mime_type(extension)
 
             file_info = {
                 "name": os.path.basename(file_path),
@@ -73,16 +268,12 @@ class FileAnalyzer:
                 "size": stat_info.st_size,
                 "created": datetime.fromtimestamp(stat_info.st_ctime).isoformat(),
                 "modified": datetime.fromtimestamp(stat_info.st_mtime).isoformat(),
-                "extension": os.path.splitext(file_path)[1].lower(),
+                "extension": extension,
+                "mime_type": mime_type,
+                #Спроба визначити мову для файлів коду
+                "language": _EXT_TO_LANG.get(extension),
             }
 
-            #Отримання міметипів
-            mime_type, encoding = mimetypes.guess_type(file_path)
-            file_info["mime_type"] = mime_type
-
-            #Спроба визначити мову для файлів коду
-            file_info["language"] = self._detect_file_language(file_path)
-
             return file_info
         except Exception as e:
             self.logger.error(f"Error getting file info for {file_path}: {str(e)}")
@@ -98,47 +289,20 @@ class FileAnalyzer:
         Returns:
             str: Визначена мова or None
         """
-        extension = os.path.splitext(file_path)[1].lower()
-
-        #Базове розширення для відображення мов
-        ext_to_lang = {
-            '.py': 'Python',
-            '.js': 'JavaScript',
-            '.html': 'HTML',
-            '.css': 'CSS',
-            '.java': 'Java',
-            '.c': 'C',
-            '.cpp': 'C++',
-            '.cs': 'C#',
-            '.php': 'PHP',
-            '.rb': 'Ruby',
-            '.go': 'Go',
-            '.ts': 'TypeScript',
-            '.jsx': 'React',
-            '.tsx': 'React',
-            '.md': 'Markdown',
-            '.json': 'JSON',
-            '.xml': 'XML',
-            '.sql': 'SQL',
-            '.sh': 'Shell',
-            '.bat': 'Batch',
-            '.ps1': 'PowerShell'
-        }
-
-        return ext_to_lang.get(extension)
+        return _EXT_TO_LANG.get(_split_extension(file_path))
 
     def get_directory_statistics(self, file_paths):
         """
         Отримання статистики файлів в директорії
 
         Args:
-            file_paths (list): Список шляхів до файлів
+            file_paths (iterable): Шляхи до файлів (список або генератор)
 
         Returns:
             dict: Словник зі статистикою
         """
         stats = {
-            "total_files": len(file_paths),
+            "total_files": 0,
             "total_size": 0,
             "extensions": defaultdict(int),
             "mime_types": defaultdict(int),
@@ -162,32 +326,32 @@ class FileAnalyzer:
             "newest_files": []
         }
 
-        if not file_paths:
-            return stats
-
         oldest_time = None
         newest_time = None
         largest_size = 0
-        all_file_infos = []
+        largest_size_per_lang = {}
+        top_by_size = []
+        top_by_date = []
 
-        for file_path in file_paths:
+        for seq, file_path in enumerate(file_paths):
+            stats["total_files"] += 1
             try:
-                file_info = self.get_file_info(file_path)
+                extension = _split_extension(file_path)
+                file_info = self.get_file_info(file_path, extension=extension, mime_type=_guess_mime_type(extension))
                 if not file_info:
                     continue
 
-                all_file_infos.append(file_info)
+                #Оновлення найбільших і найновіших файлів
+                _push_top(top_by_size, (file_info["size"], -seq, file_info))
+                _push_top(top_by_date, (file_info["modified"], -seq, file_info))
 
                 #Оновлення базової статистики
                 stats["total_size"] += file_info["size"]
-                extension = file_info["extension"]
                 stats["extensions"][extension] += 1
 
                 #Підрахування рядків, якщо це текстовий файл
-                lines = 0
-                if self._is_text_file(file_path):
-                    lines = self._count_lines(file_path)
-                    stats["total_lines"] += lines
+                _, lines = self._analyze_file(file_path, file_info["mime_type"], extension)
+                stats["total_lines"] += lines
 
                 #Оновлення мовної статистики
                 language = file_info.get("language", "Unknown")
@@ -202,8 +366,8 @@ class FileAnalyzer:
                     lang_stats["extensions"].add(extension)
 
                     #Перевірка, чи це найбільший файл для цієї мови
-                    if not lang_stats["largest_file"] or file_info["size"] > os.path.getsize(
-                            lang_stats["largest_file"]):
+                    if language not in largest_size_per_lang or file_info["size"] > largest_size_per_lang[language]:
+                        largest_size_per_lang[language] = file_info["size"]
                         lang_stats["largest_file"] = file_path
 
                 if file_info["mime_type"]:
@@ -243,120 +407,145 @@ class FileAnalyzer:
                 lang_stats["extensions"] = list(lang_stats["extensions"])
 
         #Сортування інформації про файл для найбільших і найновіших файлів
-        sorted_by_size = sorted(all_file_infos, key=lambda x: x["size"], reverse=True)
-        stats["largest_files"] = sorted_by_size[:10]
-
-        sorted_by_date = sorted(all_file_infos, key=lambda x: x["modified"], reverse=True)
-        stats["newest_files"] = sorted_by_date[:10]
+        stats["largest_files"] = [entry[2] for entry in sorted(top_by_size, reverse=True)]
+        stats["newest_files"] = [entry[2] for entry in sorted(top_by_date, reverse=True)]
 
         return stats
 
-    def _is_text_file(self, file_path):
-        """Перевірка, чи файл є текстовим"""
-        mime_type, _ = mimetypes.guess_type(file_path)
-        if mime_type and mime_type.startswith('text/'):
-            return True
+    def _is_text_file(self, file_path, mime_type=None, ext=None):
+        """Перевірка, чи файл є текстовим
 
-        #Додаткова перевірка файлів вихідного коду
-        ext = os.path.splitext(file_path)[1].lower()
-        code_extensions = ['.py', '.js', '.html', '.css', '.java', '.c', '.cpp', '.cs',
-                           '.php', '.rb', '.go', '.ts', '.jsx', '.tsx', '.md', '.json',
-                           '.xml', '.sql', '.sh', '.bat', '.ps1']
-        if ext in code_extensions:
+        Args:
+            file_path (str): Шлях до файлу
+            mime_type (str): Вже визначений міметип (може бути None, якщо не визначено)
+            ext (str): Вже визначене розширення в нижньому регістрі
+                (None - визначити розширення і міметип за шляхом)
+        """
+        if ext is None:
+            ext = _split_extension(file_path)
+            mime_type = _guess_mime_type(ext)
+        if _is_text_type(mime_type, ext):
             return True
 
         #Спроба визначення кодування в крайньому випадку
         try:
             with open(file_path, 'rb') as f:
-                sample = f.read(4096)
-                result = chardet.detect(sample)
-                if result['encoding'] and result['confidence'] > 0.7:
-                    return True
+                return _looks_like_text(f.read(ENCODING_SAMPLE_SIZE))
         except:
-            pass
+            return False
 
-        return False
+    def _analyze_file(self, file_path, mime_type, ext):
+        """
+        Перевірка, чи файл текстовий, і підрахунок рядків за одне відкриття
+
+        Читається заголовок файлу для визначення кодування (якщо міметип або
+        розширення не вказують на текст), і для текстових файлів читання
+        продовжується з того ж дескриптора для підрахунку рядків.
+
+        Args:
+            file_path (str): Шлях до файлу
+            mime_type (str): Міметип (може бути None)
+            ext (str): Розширення в нижньому регістрі
 
-    def _count_lines(self, file_path):
-        """Підрахування кількісті рядків у файлі"""
+        Returns:
+            tuple: (чи файл текстовий, кількість рядків)
+        """
+        is_text = _is_text_type(mime_type, ext)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return sum(1 for _ in f)
-        except UnicodeDecodeError:
-            try:
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    return sum(1 for _ in f)
-            except:
-                return 0
-        except:
-            return 0
+            with open(file_path, 'rb', buffering=0) as f:
+                head = f.read(ENCODING_SAMPLE_SIZE)
+                if not is_text:
+                    is_text = _looks_like_text(head)
+                    if not is_text:
+                        return False, 0
+                return True, count_lines_in_stream(f, head)
+        except Exception:
+            return is_text, 0
 
     def find_duplicate_files(self, file_paths):
         """
-        Пошук дублікатів файлів за розміром та іменем
+        Пошук дублікатів файлів за вмістом
+
+        Файли групуються за розміром, у групах з кількох файлів порівнюється хеш
+        перших і останніх 64 КіБ, і лише при збігу - хеш усього вмісту.
 
         Args:
-            file_paths (list): Список шляхів до файлів
+            file_paths (iterable): Шляхи до файлів (список або генератор)
 
         Returns:
-            dict: Словник з повторюваними файлами, згрупованими за розміром, а потім за назвою
+            dict: Словник з повторюваними файлами, згрупованими за розміром, а потім за хешем вмісту
         """
         #Групування файлів за розміром
         files_by_size = defaultdict(list)
 
         for file_path in file_paths:
             try:
-                stat_info = os.stat(file_path)
-                size = stat_info.st_size
-                files_by_size[size].append(file_path)
-            except Exception as e:
+                files_by_size[os.stat(file_path).st_size].append(file_path)
+            except OSError as e:
                 self.logger.error(f"Error processing file {file_path}: {str(e)}")
 
         #Пошук дублікатів
         duplicates = {}
 
         for size, files in files_by_size.items():
-            if len(files) > 1:
-                #Групування за ім'ям
-                files_by_name = defaultdict(list)
+            if len(files) < 2:
+                continue
 
-                for file_path in files:
-                    name = os.path.basename(file_path)
-                    files_by_name[name].append(file_path)
+            #Групування за хешем початку і кінця файлу
+            groups = self._group_by_digest(files, lambda path: _partial_digest(path, size))
 
-                #Додавання до дублікатів, якщо є кілька файлів з однаковими іменами
-                for name, name_files in files_by_name.items():
-                    if len(name_files) > 1:
-                        duplicates[f"{name} ({size} bytes)"] = name_files
+            #Для великих файлів збіг часткового хешу перевіряється хешем всього вмісту
+            if size > 2 * HASH_BLOCK_SIZE:
+                full_groups = {}
+                for partial_files in groups.values():
+                    full_groups.update(self._group_by_digest(partial_files, _full_digest))
+                groups = full_groups
+
+            for digest, group in groups.items():
+                duplicates[f"{os.path.basename(group[0])} ({size} bytes, {digest})"] = group
 
         return duplicates
 
+    def _group_by_digest(self, file_paths, digest_func):
+        """
+        Групування файлів за хешем
+
+        Args:
+            file_paths (list): Список шляхів до файлів
+            digest_func (callable): Функція, що повертає хеш файлу
+
+        Returns:
+            dict: Словник з хешем як ключем і списком шляхів як значенням (лише групи з кількох файлів)
+        """
+        files_by_digest = defaultdict(list)
+        for file_path in file_paths:
+            try:
+                files_by_digest[digest_func(file_path)].append(file_path)
+            except OSError as e:
+                self.logger.error(f"Error hashing file {file_path}: {str(e)}")
+
+        return {digest: files for digest, files in files_by_digest.items() if len(files) > 1}
+
     def identify_file_patterns(self, file_paths, min_pattern_count=3):
         """
         Визначення загальних шаблонів в назвах файлів
 
         Args:
-            file_paths (list): Список шляхів до файлів
+            file_paths (iterable): Шляхи до файлів (список або генератор)
             min_pattern_count (int): Мінімальна кількість файлів для розгляду шаблону
 
         Returns:
             dict: Словник зі зразками та відповідними файлами
         """
-        #Витягнення дефолтних імен без розширень
-        base_names = []
-
-        for file_path in file_paths:
-            filename = os.path.basename(file_path)
-            base_name = os.path.splitext(filename)[0]
-            base_names.append((base_name, file_path))
-
         #Пошук спільних закономірностей
         patterns = defaultdict(list)
 
         #Шаблон 1: Файли з числовими суфіксами типу «file1», «file2» і т.д.
         numeric_pattern = re.compile(r"^(.+?)(\d+)$")
 
-        for base_name, file_path in base_names:
+        for file_path in file_paths:
+            #Витягнення дефолтного імені без розширення
+            base_name = os.path.splitext(os.path.basename(file_path))[0]
             match = numeric_pattern.match(base_name)
             if match:
                 prefix = match.group(1)
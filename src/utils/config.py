@@ -162,6 +162,17 @@ LANGUAGE_CONFIG: Dict[str, Dict[str, List[str]]] = {
     }
 }
 
+#Індекси, похідні від мовного конфігу (будуються один раз під час імпорту)
+SOURCE_CODE_EXTENSIONS = frozenset(
+    ext for config in LANGUAGE_CONFIG.values() for ext in config['extensions'])
+
+#Розширення належить першій мові, що його перелічує
+EXTENSION_TO_LANGUAGE: Dict[str, str] = {
+    ext: lang
+    for lang, config in reversed(list(LANGUAGE_CONFIG.items()))
+    for ext in config['extensions']
+}
+
 #Ігнорування шаблонів для файлових операцій
 IGNORE_PATTERNS = [
     '__pycache__',
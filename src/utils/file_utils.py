@@ -1,43 +1,109 @@
 import os
-from typing import List, Optional, Set
+import re
+from typing import BinaryIO, Iterator, List, Optional, Set, Tuple
 from pathlib import Path
 import fnmatch
 import shutil
+from functools import lru_cache
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-from .config import LANGUAGE_CONFIG, IGNORE_PATTERNS, MAX_FILE_SIZE
+from .config import SOURCE_CODE_EXTENSIONS, IGNORE_PATTERNS, MAX_FILE_SIZE, MAX_THREADS
 
+#Розмір блоку для підрахунку рядків
+LINE_COUNT_CHUNK_SIZE = 1 << 20
 
-def get_files_in_directory(directory: str, extensions: Optional[List[str]] = None) -> List[str]:
-    """Отримання списоку файлів у директорії з розширеннями
+#Усі шаблони ігнорування, зібрані в один регулярний вираз
+_IGNORE_RE = re.compile("|".join(
+    f"(?:{fnmatch.translate(os.path.normcase(pattern))})" for pattern in IGNORE_PATTERNS))
+
+
+def _scan_directory(path: str) -> Tuple[List[Tuple[str, os.stat_result]], List[str]]:
+    """Читання одного рівня директорії через os.scandir
+
+    Ігноровані файли та директорії відфільтровуються одразу. Результат stat
+    береться з DirEntry, тож розмір файлу не потребує окремого системного виклику.
 
     Args:
-        directory: Шлях до директорії
-        extensions: Список розширень файлів для фільтрації (None для всіх файлів)
+        path: Шлях до директорії
 
     Returns:
-        Список шляхів до знайдених файлів
+        Кортеж (список пар (шлях до файлу, результат stat), список піддиректорій)
     """
-    file_list = []
-    for root, dirs, files in os.walk(directory):
-        #Фільтрування ігнорованих директорій
-        dirs[:] = [d for d in dirs if not should_ignore(d)]
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if should_ignore(entry.name):
+                    continue
+
+                try:
+                    if entry.is_dir():
+                        #Як і os.walk, не заходимо в символічні посилання на директорії
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                        continue
+
+                    #Для символічних посилань береться stat цілі, як у os.path.getsize,
+                    #щоб посилання на великий файл не оминало перевірку MAX_FILE_SIZE
+                    files.append((entry.path, entry.stat()))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def _scandir_recursive(root: str, max_workers: int = MAX_THREADS) -> Iterator[Tuple[str, os.stat_result]]:
+    """Паралельний рекурсивний обхід директорії
+
+    Кожна директорія читається окремою задачею пулу потоків, знайдені
+    піддиректорії одразу ставляться в чергу. Читання директорій обмежене
+    затримкою файлової системи, а GIL звільняється на час системних викликів.
+    Результати забираються в порядку постановки задач (обхід у ширину), тож
+    порядок файлів однаковий між запусками.
 
-        for file in files:
-            if should_ignore(file):
-                continue
+    Args:
+        root: Шлях до директорії
+        max_workers: Максимальна кількість потоків
 
-            file_path = os.path.join(root, file)
+    Yields:
+        Кортежі (шлях до файлу, результат stat)
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque([executor.submit(_scan_directory, root)])
+        while pending:
+            files, subdirs = pending.popleft().result()
+            pending.extend(executor.submit(_scan_directory, d) for d in subdirs)
+            yield from files
 
-            #Перевірка розміру файлу
-            if os.path.getsize(file_path) > MAX_FILE_SIZE:
-                continue
 
-            if extensions:
-                if any(file.endswith(ext) for ext in extensions):
-                    file_list.append(file_path)
-            else:
-                file_list.append(file_path)
-    return file_list
+def get_files_in_directory(directory: str, extensions: Optional[List[str]] = None) -> Iterator[str]:
+    """Отримання файлів у директорії з розширеннями
+
+    Файли повертаються по одному, без формування повного списку в пам'яті.
+
+    Args:
+        directory: Шлях до директорії
+        extensions: Список розширень файлів для фільтрації (None для всіх файлів)
+
+    Yields:
+        Шляхи до знайдених файлів
+    """
+    #str.endswith з кортежем перевіряє всі розширення за один виклик
+    extensions_tuple = tuple(extensions) if extensions else None
+
+    for file_path, stat_info in _scandir_recursive(directory):
+        #Перевірка розміру файлу
+        if stat_info.st_size > MAX_FILE_SIZE:
+            continue
+
+        if extensions_tuple:
+            if file_path.endswith(extensions_tuple):
+                yield file_path
+        else:
+            yield file_path
 
 
 def create_directory(path: str) -> None:
@@ -58,20 +124,23 @@ def is_source_code_file(file_path: str) -> bool:
     Returns:
         True, якщо файл є файлом вихідного коду, інакше False
     """
-    extensions = [ext for lang in LANGUAGE_CONFIG.values() for ext in lang['extensions']]
-    return any(file_path.endswith(ext) for ext in extensions)
+    return Path(file_path).suffix.lower() in SOURCE_CODE_EXTENSIONS
 
 
+@lru_cache(maxsize=8192)
 def should_ignore(path: str) -> bool:
     """Перевірка, чи слід ігнорувати файл або директорію
 
+    Результат кешується: IGNORE_PATTERNS є константою модуля, а однакові імена
+    (src, test, __pycache__) трапляються під час обходу багато разів.
+
     Args:
         path: Шлях до файлу або директорії
 
     Returns:
         True, якщо шлях слід ігнорувати, інакше False
     """
-    return any(fnmatch.fnmatch(path, pattern) for pattern in IGNORE_PATTERNS)
+    return _IGNORE_RE.match(os.path.normcase(path)) is not None
 
 
 def copy_file(src: str, dest: str) -> None:
@@ -100,6 +169,35 @@ def move_file(src: str, dest: str) -> None:
         print(f"Помилка переміщення {src}: {str(e)}")
 
 
+def count_lines_in_stream(stream: BinaryIO, head: bytes = b'') -> int:
+    """Підрахунок кількості рядків у відкритому бінарному потоці
+
+    Дані читаються через readinto у попередньо виділений буфер розміром 1 МіБ
+    без декодування, рядки рахуються як кількість байтів нового рядка. Останній
+    рядок без символу нового рядка також враховується.
+
+    Args:
+        stream: Потік, відкритий в бінарному режимі
+        head: Вже прочитаний з потоку початок файлу
+
+    Returns:
+        Кількість рядків
+    """
+    lines = head.count(b'\n')
+    last_byte = head[-1:]
+    buffer = bytearray(LINE_COUNT_CHUNK_SIZE)
+    view = memoryview(buffer)
+    while True:
+        size = stream.readinto(buffer)
+        if not size:
+            break
+        lines += buffer.count(b'\n', 0, size)
+        last_byte = view[size - 1:size].tobytes()
+    if last_byte and last_byte != b'\n':
+        lines += 1
+    return lines
+
+
 def count_lines_in_file(file_path: str) -> int:
     """Підрахунок кількості рядків у файлі
 
@@ -110,14 +208,8 @@ def count_lines_in_file(file_path: str) -> int:
         Кількість рядків у файлі
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return sum(1 for _ in file)
-    except UnicodeDecodeError:
-        try:
-            with open(file_path, 'r', encoding='latin-1') as file:
-                return sum(1 for _ in file)
-        except Exception:
-            return 0
+        with open(file_path, 'rb', buffering=0) as file:
+            return count_lines_in_stream(file)
     except Exception:
         return 0
 
@@ -128,4 +220,4 @@ def get_all_source_code_extensions() -> Set[str]:
     Returns:
         Множина всіх розширень файлів вихідного коду
     """
-    return {ext for lang in LANGUAGE_CONFIG.values() for ext in lang['extensions']}
\ No newline at end of file
+    return set(SOURCE_CODE_EXTENSIONS)
\ No newline at end of file
@@ -1,6 +1,38 @@
 from pathlib import Path
-from typing import Optional, List, Dict
-from .config import LANGUAGE_CONFIG
+from typing import Optional, List, Dict, Tuple
+from .config import LANGUAGE_CONFIG, EXTENSION_TO_LANGUAGE
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _build_signature_index() -> Dict[str, Tuple[str, ...]]:
+    """Побудова відображення сигнатурки на мови, яким вона належить"""
+    index: Dict[str, List[str]] = {}
+    for lang, config in LANGUAGE_CONFIG.items():
+        for signature in config.get('signatures', []):
+            index.setdefault(signature, []).append(lang)
+    return {signature: tuple(langs) for signature, langs in index.items()}
+
+
+def _build_signature_automaton(signature_langs: Dict[str, Tuple[str, ...]]) -> Optional["ahocorasick.Automaton"]:
+    """Побудова автомата Ахо-Корасік за сигнатурками (None, якщо pyahocorasick не встановлено)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for signature, langs in signature_langs.items():
+        automaton.add_word(signature, langs)
+    automaton.make_automaton()
+    return automaton
+
+
+#Кожна сигнатурка зустрічається один раз, навіть якщо належить кільком мовам
+_SIGNATURE_LANGS = _build_signature_index()
+
+#Автомат Ахо-Корасік знаходить усі сигнатурки за один прохід по вмісту
+_SIGNATURE_AUTOMATON = _build_signature_automaton(_SIGNATURE_LANGS)
 
 
 def detect_language(file_path: str) -> str:
@@ -12,11 +44,7 @@ def detect_language(file_path: str) -> str:
     Returns:
         Назва мови програмування або 'Unknown'
     """
-    ext = Path(file_path).suffix.lower()
-    for lang, config in LANGUAGE_CONFIG.items():
-        if ext in config['extensions']:
-            return lang
-    return 'Unknown'
+    return EXTENSION_TO_LANGUAGE.get(Path(file_path).suffix.lower(), 'Unknown')
 
 
 def get_language_extensions(language: str) -> List[str]:
@@ -76,10 +104,16 @@ def detect_language_from_content(content: str) -> str:
     scores: Dict[str, int] = {lang: 0 for lang in LANGUAGE_CONFIG}
 
     #Підрахунок кількості сигнатурок для кожної мови
-    for lang, config in LANGUAGE_CONFIG.items():
-        for signature in config.get('signatures', []):
+    if _SIGNATURE_AUTOMATON is not None:
+        for _, langs in _SIGNATURE_AUTOMATON.iter(content):
+            for lang in langs:
+                scores[lang] += 1
+    else:
+        for signature, langs in _SIGNATURE_LANGS.items():
             count = content.count(signature)
-            scores[lang] += count
+            if count:
+                for lang in langs:
+                    scores[lang] += count
 
     #Вибір мови з найбільшою кількістю збігів
     if any(scores.values()):